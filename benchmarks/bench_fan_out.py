@@ -0,0 +1,62 @@
+"""
+Compare broadcasting a message to many `mild_reminiscence` handlers
+against a `FanOut` that does each distinct lookup only once.
+
+    python -m benchmarks.bench_fan_out
+"""
+
+import time
+
+from nostalgia import FanOut, mild_reminiscence, parse_signature
+
+
+class CountingDict(dict):
+    lookups = 0
+
+    def __getitem__(self, key):
+        CountingDict.lookups += 1
+        return super().__getitem__(key)
+
+
+SIGNATURES = [
+    "{ {user, tenant}:meta, body }",
+    "{ {user, tenant}:meta, (first, second):tags }",
+    "{ {user, tenant, region}:meta }",
+]
+
+
+def make_message():
+    return CountingDict(
+        meta=CountingDict(user="alice", tenant="acme", region="eu"),
+        body="hello",
+        tags=["a", "b"],
+    )
+
+
+def make_handlers(n):
+    fan_out = FanOut()
+    separate = []
+    for i in range(n):
+        sig = SIGNATURES[i % len(SIGNATURES)]
+        (_, names), _ = parse_signature(sig)
+        fn = eval(f"lambda {', '.join(names)}: None")
+        fan_out.subscribe(sig)(fn)
+        separate.append(mild_reminiscence(sig)(fn))
+    return fan_out, separate
+
+
+def run(name, publish, messages):
+    CountingDict.lookups = 0
+    start = time.perf_counter()
+    for message in messages:
+        publish(message)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>24}: {CountingDict.lookups / len(messages):6.1f} lookups/message, {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    messages = [make_message() for _ in range(2000)]
+    for n in [3, 30, 300]:
+        fan_out, separate = make_handlers(n)
+        run(f"{n} separate handlers", lambda m: [h(m) for h in separate], messages)
+        run(f"{n} handlers in a FanOut", fan_out.publish, messages)
@@ -0,0 +1,34 @@
+"""
+Compare a compiled `key` against an equivalent lambda
+and a composition of `operator.itemgetter`s.
+
+    python -m benchmarks.bench_key
+"""
+
+import timeit
+from operator import itemgetter
+
+from nostalgia import key
+
+SIG = "{ {vol:loudness}:config, (t1, _):first_line }"
+
+RECORDS = [
+    {"config": {"loudness": i % 11, "device": "speaker"}, "first_line": [f"topic{i % 97}", "regret"]}
+    for i in range(100_000)
+]
+
+compiled = key(SIG)
+by_lambda = lambda r: (r["config"]["loudness"], r["first_line"][0])  # noqa: E731
+
+_config, _loudness, _first_line, _first = (
+    itemgetter("config"), itemgetter("loudness"), itemgetter("first_line"), itemgetter(0)
+)
+by_itemgetter = lambda r: (_loudness(_config(r)), _first(_first_line(r)))  # noqa: E731
+
+
+if __name__ == "__main__":
+    assert list(map(compiled, RECORDS)) == list(map(by_lambda, RECORDS)) == list(map(by_itemgetter, RECORDS))
+
+    for name, fn in [("key", compiled), ("lambda", by_lambda), ("itemgetter", by_itemgetter)]:
+        elapsed = min(timeit.repeat(lambda: sorted(RECORDS, key=fn), number=1, repeat=5))
+        print(f"{name:>10}: {elapsed * 1000:8.1f} ms per sort")
@@ -0,0 +1,90 @@
+"""
+Compare eager and lazy leaf binding on a branchy handler
+where every `__getitem__` on the record is expensive.
+
+With `check_keys=True` the lazy converter does one `key in row` per key,
+but only if the row has its own `__contains__`. `PlainRow` keeps the default
+`Mapping.__contains__`, which fetches the value, so its keys aren't checked up front.
+
+    python -m benchmarks.bench_lazy
+"""
+
+import time
+from collections.abc import Mapping
+
+from nostalgia import mild_reminiscence
+
+
+class PlainRow(Mapping):
+    # keeps the default `Mapping.__contains__`, which calls `__getitem__`
+    fetches = 0
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        PlainRow.fetches += 1
+        time.sleep(0.00001)  # pretend to talk to the database
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SlowRow(PlainRow):
+    # can tell whether a key exists without fetching it
+    def __contains__(self, key):
+        return key in self._data
+
+
+SIG = "{kind, user, tenant, body, {region, tier}:meta}"
+
+
+@mild_reminiscence(SIG)
+def handle_eager(kind, user, tenant, body, region, tier):
+    if kind == "ping":
+        return None
+    return user, body
+
+
+def _lazy_body(kind, user, tenant, body, region, tier):
+    if kind.get() == "ping":
+        return None
+    return user.get(), body.get()
+
+
+handle_lazy = mild_reminiscence(SIG, lazy=True)(_lazy_body)
+handle_lazy_unchecked = mild_reminiscence(SIG, lazy=True, check_keys=False)(_lazy_body)
+
+
+def make_rows(n, row_type):
+    return [
+        row_type({
+            "kind": "ping" if i % 2 else "message",
+            "user": f"user{i}",
+            "tenant": "acme",
+            "body": "x" * 100,
+            "meta": row_type({"region": "eu", "tier": "gold"}),
+        })
+        for i in range(n)
+    ]
+
+
+def run(name, handler, rows):
+    PlainRow.fetches = 0
+    start = time.perf_counter()
+    for row in rows:
+        handler(row)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>36}: {PlainRow.fetches:6} fetches, {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    for row_type in [SlowRow, PlainRow]:
+        rows = make_rows(2000, row_type)
+        run(f"{row_type.__name__} eager", handle_eager, rows)
+        run(f"{row_type.__name__} lazy", handle_lazy, rows)
+        run(f"{row_type.__name__} lazy, check_keys=False", handle_lazy_unchecked, rows)
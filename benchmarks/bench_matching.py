@@ -0,0 +1,45 @@
+"""
+Compare routing a stream of records by catching the converter's TypeError
+against the non-raising `try_unpack`, `filter_matching` and `partition`.
+
+    python -m benchmarks.bench_matching
+"""
+
+import time
+
+from nostalgia import filter_matching, parse_signature, partition
+
+_, converter = parse_signature("{kind, {user, tenant}:meta, (lat, lon):where}")
+
+
+def make_records(n):
+    good = {"kind": "event", "meta": {"user": "u", "tenant": "t"}, "where": (1.0, 2.0)}
+    bad = {"kind": "event", "meta": {"user": "u"}, "where": (1.0, 2.0)}
+    return [good if i % 2 else bad for i in range(n)]
+
+
+def partition_with_exceptions(records):
+    matching = []
+    non_matching = []
+    for record in records:
+        try:
+            converter(record)
+        except TypeError:
+            non_matching.append(record)
+        else:
+            matching.append(record)
+    return matching, non_matching
+
+
+def run(name, fn, records):
+    start = time.perf_counter()
+    fn(records)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>24}: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    records = make_records(200_000)
+    run("partition (exceptions)", partition_with_exceptions, records)
+    run("partition", lambda rs: partition(converter, rs), records)
+    run("filter_matching", lambda rs: list(filter_matching(converter, rs)), records)
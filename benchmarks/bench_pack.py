@@ -0,0 +1,40 @@
+"""
+Compare a compiled packer against building the same nested records by hand.
+
+    python -m benchmarks.bench_pack
+"""
+
+import timeit
+
+from nostalgia import parse_signature
+
+_, converter = parse_signature("{(a, b):first_line, {vol:loudness, device}:config, max_tokens}")
+pack = converter.packer()
+
+ROWS = [("love", "regret", i % 11, "speaker", 5000) for i in range(100_000)]
+
+
+def by_hand(rows):
+    out = []
+    for a, b, vol, device, max_tokens in rows:
+        record = {}
+        record["first_line"] = [a, b]
+        config = {}
+        config["loudness"] = vol
+        config["device"] = device
+        record["config"] = config
+        record["max_tokens"] = max_tokens
+        out.append(record)
+    return out
+
+
+if __name__ == "__main__":
+    assert by_hand(ROWS) == pack.many(ROWS) == [pack(*row) for row in ROWS]
+
+    for name, fn in [
+        ("by hand", by_hand),
+        ("pack", lambda rows: [pack(*row) for row in rows]),
+        ("pack.many", pack.many),
+    ]:
+        elapsed = min(timeit.repeat(lambda: fn(ROWS), number=1, repeat=5))
+        print(f"{name:>10}: {elapsed * 1000:8.1f} ms")
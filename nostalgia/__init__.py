@@ -1,13 +1,21 @@
+from collections.abc import Mapping
 from enum import Enum
 from functools import wraps
+from itertools import count
 import inspect
 
 __all__ = (
     "BadSignature",
+    "Deferred",
+    "FanOut",
+    "NO_MATCH",
     "TokenKind",
     "nostalgia",
     "mild_reminiscence",
     "parse_signature",
+    "filter_matching",
+    "partition",
+    "key",
 )
 
 
@@ -31,6 +39,54 @@ class TokenKind(Enum):
     comma = ","
 
 
+class Deferred:
+    """
+    A leaf bound by a lazy converter (see `parse_signature`).
+    The value is only fetched from its container on the first call to `get()`.
+    """
+
+    __slots__ = ("_source", "_key", "_path", "_value")
+
+    def __init__(self, source, key, path):
+        self._source = source
+        self._key = key
+        self._path = path
+        self._value = _UNFETCHED
+
+    @classmethod
+    def resolved(cls, value):
+        deferred = cls(None, None, None)
+        deferred._value = value
+        return deferred
+
+    def get(self):
+        if self._value is _UNFETCHED:
+            try:
+                self._value = self._source[self._key]
+            except KeyError:
+                raise TypeError(f"Missing key {self._key!r} at {self._path}")
+            self._source = None
+        return self._value
+
+    def __repr__(self):
+        if self._value is _UNFETCHED:
+            return f"<Deferred {self._key!r} at {self._path}>"
+        return f"<Deferred {self._value!r}>"
+
+
+_UNFETCHED = object()
+
+
+class _NoMatch:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "NO_MATCH"
+
+
+NO_MATCH = _NoMatch()
+
+
 def nostalgia(fn):
     fn_sig = inspect.signature(fn)
     _validate_function(fn_sig)
@@ -62,8 +118,10 @@ def nostalgia(fn):
     return wrapper
 
 
-def mild_reminiscence(text_sig):
-    (_in_count, expected_param_names), converter = parse_signature(text_sig)
+def mild_reminiscence(text_sig, *, lazy=False, check_keys=True):
+    (_in_count, expected_param_names), converter = parse_signature(
+        text_sig, lazy=lazy, check_keys=check_keys
+    )
 
     def decorator(fn):
         fn_sig = inspect.signature(fn)
@@ -78,6 +136,143 @@ def mild_reminiscence(text_sig):
     return decorator
 
 
+class FanOut:
+    """
+    Calls many handlers with the same message, each unpacking it with its own signature.
+    The signatures are merged into one tree, so a lookup shared by several handlers
+    (like `meta` and `user` in `{ {user}:meta, ... }`) is done only once per message.
+    """
+
+    def __init__(self):
+        self._steps = []  # (parent_node, op, arg, where); a node is an index in this list
+        self._paths = []  # node -> path of its value, like `0.'meta'.1`
+        self._nodes = {}  # (parent_node, op, arg) -> node
+        self._handlers = []  # (fn, in_count, leaf_nodes, end_nodes)
+
+    def subscribe(self, text_sig):
+        """
+        Decorator factory, like `mild_reminiscence`.
+        The decorated function is registered and returned unchanged.
+        """
+        patterns = _parse_patterns(text_sig)
+        expected_param_names = list(_gather_arg_names(("list", patterns)))
+
+        def decorator(fn):
+            fn_sig = inspect.signature(fn)
+            _validate_function(fn_sig)
+            _prevent_signature_mismatch(expected_param_names, fn, fn_sig)
+
+            leaf_nodes = []
+            end_nodes = []
+            for i, pattern in enumerate(patterns):
+                arg = self._node(None, "arg", i, str(i), str(i))
+                self._add_pattern(arg, pattern, leaf_nodes, end_nodes)
+            self._handlers.append((fn, len(patterns), leaf_nodes, end_nodes))
+            return fn
+
+        return decorator
+
+    def publish(self, *args):
+        """
+        Call every handler with the values bound from `args`, in subscription order.
+        Returns a list with each handler's return value. A handler that raised,
+        whose signature didn't match, or that needs a lookup that raised,
+        gets the exception in its place instead.
+        """
+        values = []
+        for parent, op, arg, where in self._steps:
+            if op == "arg":
+                value = args[arg] if arg < len(args) else _Failure(TypeError(f"Missing argument {where}"))
+            else:
+                value = values[parent]
+                if type(value) is _Failure:
+                    pass
+                elif op == "key":
+                    try:
+                        value = value[arg]
+                    except (KeyError, TypeError):
+                        value = _Failure(TypeError(f"Missing key {arg!r} at {where}"))
+                    except Exception as exc:
+                        value = _Failure(exc)
+                elif op == "items":
+                    try:
+                        value = list(value)
+                    except TypeError:
+                        value = _Failure(TypeError(f"Expected a sequence at {where}"))
+                    except Exception as exc:
+                        value = _Failure(exc)
+                elif op == "len":
+                    if len(value) != arg:
+                        value = _Failure(TypeError(f"Expected {arg} items at {where}, got {len(value)}"))
+                elif op == "index":
+                    value = value[arg]
+                else:
+                    assert False, f"{op=}"
+            values.append(value)
+
+        results = []
+        for fn, in_count, leaf_nodes, end_nodes in self._handlers:
+            if in_count != len(args):
+                results.append(TypeError(f"Expected {in_count} positional arguments, got {len(args)}"))
+                continue
+
+            failure = next((values[node] for node in end_nodes if type(values[node]) is _Failure), None)
+            if failure is not None:
+                # only the handlers that depend on a failed lookup get its error
+                results.append(failure.error)
+                continue
+
+            out_args = [values[node] for node in leaf_nodes]
+            try:
+                results.append(fn(*out_args))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def _add_pattern(self, node, pattern, leaf_nodes, end_nodes):
+        # A failure is passed down to all the nodes below, so it's enough to check
+        # the end of every branch, including empty `()` and `{}` that bind nothing.
+        pat_kind, pat_value = pattern
+        path = self._paths[node]
+
+        if pat_kind == "ident":
+            leaf_nodes.append(node)
+            end_nodes.append(node)
+
+        elif pat_kind == "list":
+            items = self._node(node, "items", None, path, path)
+            items = self._node(items, "len", len(pat_value), path, path)
+            if not pat_value:
+                end_nodes.append(items)
+            for i, subpattern in enumerate(pat_value):
+                item = self._node(items, "index", i, path, f"{path}.{i}")
+                self._add_pattern(item, subpattern, leaf_nodes, end_nodes)
+
+        elif pat_kind == "map":
+            if not pat_value:
+                end_nodes.append(node)
+            for key, subpattern in pat_value:
+                value = self._node(node, "key", key, path, f"{path}.{key!r}")
+                self._add_pattern(value, subpattern, leaf_nodes, end_nodes)
+
+        else:
+            assert False, f"{pat_kind=}"
+
+    def _node(self, parent, op, arg, where, path):
+        if (parent, op, arg) not in self._nodes:
+            self._nodes[parent, op, arg] = len(self._steps)
+            self._steps.append((parent, op, arg, where))
+            self._paths.append(path)
+        return self._nodes[parent, op, arg]
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
 def _prevent_signature_mismatch(expected_param_names, fn, fn_sig):
     actual_param_names = list(fn_sig.parameters)
     if expected_param_names != actual_param_names:
@@ -104,14 +299,98 @@ def _validate_function(fn_sig):
             )
 
 
-def parse_signature(sig):
+def parse_signature(sig, *, lazy=False, check_keys=True):
     """
     Parse an unpacking signature (as a string).
     Returns a tuple of (transform, converter).
     - transform is a (input_argument_count, expected_function_arg_names) tuple
     - converter is a function mapping (*input_args) to a list of output args
+
+    The converter also has two non-raising attributes:
+    - converter.try_unpack(*input_args) returns the output args, or NO_MATCH
+    - converter.matches(*input_args) returns whether the input args fit
+
+    and a compiled inverse: converter.packer(sequence=list) returns pack(*output_args),
+    which builds the input arg back (a tuple of them if there are several),
+    and pack.many(rows), which does the same for an iterable of output args.
+
+    With `lazy=True`, every output arg is a `Deferred`, and a value bound
+    directly to a map key is only fetched when its `get()` is called.
+    `check_keys` decides whether missing keys are reported by the converter
+    or only when the value is accessed. `try_unpack` and `matches` always look
+    the values up, the same way as for non-lazy converters.
+    Checking costs one `key in mapping` per key, so it's only done on
+    `collections.abc.Mapping`s with their own `__contains__` (the default one
+    fetches the value) and without `__missing__`. Everything else reports
+    missing keys on `get()`, so lazy unpacking never fetches more than eager.
     """
 
+    patterns = _parse_patterns(sig)
+    in_count = len(patterns)
+    expected_arg_names = list(_gather_arg_names(("list", patterns)))
+
+    if lazy:
+        def converter(*args):
+            if len(args) != len(patterns):
+                raise TypeError(f"Expected {len(patterns)} positional arguments, got {len(args)}")
+
+            out_args = []
+            for i, (arg, pattern) in enumerate(zip(args, patterns)):
+                out_args.extend(_unpack_pattern_lazy(arg, pattern, str(i), check_keys))
+            return out_args
+    else:
+        def converter(*args):
+            if len(args) != len(patterns):
+                raise TypeError(f"Expected {len(patterns)} positional arguments, got {len(args)}")
+
+            out_args = []
+            for i, (arg, pattern) in enumerate(zip(args, patterns)):
+                out_args.extend(_unpack_pattern(arg, pattern, str(i)))
+            return out_args
+
+    def try_unpack(*args):
+        if len(args) != len(patterns):
+            return NO_MATCH
+
+        out_args = []
+        for arg, pattern in zip(args, patterns):
+            if not _try_unpack_pattern(arg, pattern, out_args):
+                return NO_MATCH
+        if lazy:
+            # matching had to look every value up anyway, so hand them out resolved
+            return [Deferred.resolved(out_arg) for out_arg in out_args]
+        return out_args
+
+    def matches(*args):
+        return try_unpack(*args) is not NO_MATCH
+
+    packers = {}
+
+    def packer(sequence=list):
+        if sequence not in packers:
+            packers[sequence] = _compile_packer(patterns, sequence)
+        return packers[sequence]
+
+    converter.try_unpack = try_unpack
+    converter.matches = matches
+    converter.packer = packer
+    return (in_count, expected_arg_names), converter
+
+
+def key(sig):
+    """
+    Compile a key function (for `sorted`, `min`, `heapq.merge`, `itertools.groupby`...)
+    from a signature with a single pattern, e.g. `key("{ {vol:loudness}:config, (t1, _):first_line }")`.
+    The key function returns a tuple of the bound values, leaving out the ones named `_`,
+    and raises TypeError if the record doesn't match.
+    """
+    patterns = _parse_patterns(sig)
+    if len(patterns) != 1:
+        raise ValueError(f"A key signature must have exactly one pattern, got {len(patterns)}")
+    return _compile_key(patterns[0], sig)
+
+
+def _parse_patterns(sig):
     # This part of the code is a little complicated. But in short,
     # we're keeping a stack of various states. When a sub-state (e.g. a map
     # pattern inside a list pattern) ends, it is popped from the stack and
@@ -299,19 +578,32 @@ def parse_signature(sig):
     if len(state_stack) > 1:
         raise ValueError("You forgot to close somehting in the signature")
 
-    patterns = state_stack[-1]["patterns"]
-    in_count = len(patterns)
-    expected_arg_names = list(_gather_arg_names(("list", patterns)))
+    return state_stack[-1]["patterns"]
 
-    def converter(*args):
-        if len(args) != len(patterns):
-            raise TypeError(f"Expected {len(patterns)} positional arguments, got {len(args)}")
 
-        out_args = []
-        for i, (arg, pattern) in enumerate(zip(args, patterns)):
-            out_args.extend(_unpack_pattern(arg, pattern, str(i)))
-        return out_args
-    return (in_count, expected_arg_names), converter
+def filter_matching(converter, records):
+    """
+    Lazily yield the records (each passed to the converter as a single argument)
+    that match a converter from `parse_signature`.
+    """
+    matches = converter.matches
+    return (record for record in records if matches(record))
+
+
+def partition(converter, records):
+    """
+    Split records (each passed to the converter as a single argument)
+    into a (matching, non_matching) tuple of lists.
+    """
+    matching = []
+    non_matching = []
+    matches = converter.matches
+    for record in records:
+        if matches(record):
+            matching.append(record)
+        else:
+            non_matching.append(record)
+    return matching, non_matching
 
 
 def _tokenize_sig(sig: str):
@@ -372,3 +664,207 @@ def _unpack_pattern(arg, pattern, path):
 
     else:
         assert False, f"{pat_kind=}"
+
+
+def _unpack_pattern_lazy(arg, pattern, path, check_keys):
+    pat_kind, pat_value = pattern
+
+    if pat_kind == "ident":
+        yield Deferred.resolved(arg)
+
+    elif pat_kind == "list":
+        items = list(arg)
+        if len(items) != len(pat_value):
+            raise TypeError(f"Expected {len(pat_value)} items at {path}, got {len(items)}")
+        for i, (item, subpattern) in enumerate(zip(items, pat_value)):
+            yield from _unpack_pattern_lazy(item, subpattern, f"{path}.{i}", check_keys)
+
+    elif pat_kind == "map":
+        for key, subpattern in pat_value:
+            if subpattern[0] == "ident":
+                # only leaves are deferred: nested patterns need their container right away
+                if check_keys and _can_check_keys(arg) and key not in arg:
+                    raise TypeError(f"Missing key {key!r} at {path}")
+                yield Deferred(arg, key, path)
+                continue
+
+            try:
+                arg_value = arg[key]
+            except KeyError:
+                raise TypeError(f"Missing key {key!r} at {path}")
+            yield from _unpack_pattern_lazy(arg_value, subpattern, f"{path}.{key!r}", check_keys)
+
+    else:
+        assert False, f"{pat_kind=}"
+
+
+def _can_check_keys(arg):
+    # `in` only means "has this key" for mappings, for anything else (like a
+    # database row) it's membership, so missing keys show up on `get()` instead.
+    # The default `Mapping.__contains__` fetches the value, which would make lazy
+    # unpacking fetch more than the eager one, and `in` ignores `__missing__`.
+    arg_type = type(arg)
+    return (
+        isinstance(arg, Mapping)
+        and arg_type.__contains__ is not Mapping.__contains__
+        and not hasattr(arg_type, "__missing__")
+    )
+
+
+def _try_unpack_pattern(arg, pattern, out):
+    # Same rules as `_unpack_pattern`, but reports a mismatch by returning False.
+    # Plain lists, tuples and dicts are handled without raising anything.
+    pat_kind, pat_value = pattern
+
+    if pat_kind == "ident":
+        out.append(arg)
+        return True
+
+    elif pat_kind == "list":
+        if isinstance(arg, (list, tuple)):
+            items = arg
+        else:
+            try:
+                items = list(arg)
+            except TypeError:
+                return False
+        if len(items) != len(pat_value):
+            return False
+        for item, subpattern in zip(items, pat_value):
+            if not _try_unpack_pattern(item, subpattern, out):
+                return False
+        return True
+
+    elif pat_kind == "map":
+        # `get` skips `__missing__`, so only use it when it's the same as `arg[key]`
+        is_dict = type(arg) is dict
+        for key, subpattern in pat_value:
+            if is_dict:
+                arg_value = arg.get(key, _UNFETCHED)
+                if arg_value is _UNFETCHED:
+                    return False
+            else:
+                try:
+                    arg_value = arg[key]
+                except (KeyError, TypeError):
+                    return False
+            if not _try_unpack_pattern(arg_value, subpattern, out):
+                return False
+        return True
+
+    else:
+        assert False, f"{pat_kind=}"
+
+
+def _compile_key(pattern, sig):
+    # Generates straight-line code like
+    #
+    #   def key(record):
+    #       try:
+    #           [_1, _2] = record['first_line']
+    #           return (record['config']['loudness'], _1)
+    #       except (KeyError, IndexError, TypeError, ValueError):
+    #           raise TypeError(...)
+    #
+    # Single-key maps are inlined into subscript chains, everything else gets a local.
+    lines = []
+    leaves = []
+    var_names = (f"_{i}" for i in count(1))
+
+    def visit(expr, pattern):
+        pat_kind, pat_value = pattern
+
+        if pat_kind == "ident":
+            if pat_value == "_":
+                lines.append(expr)  # still make sure that it's there
+            else:
+                leaves.append(expr)
+
+        elif pat_kind == "list":
+            item_vars = [next(var_names) for _ in pat_value]
+            lines.append(f"[{', '.join(item_vars)}] = {expr}")
+            for item_var, subpattern in zip(item_vars, pat_value):
+                visit(item_var, subpattern)
+
+        elif pat_kind == "map":
+            if len(pat_value) > 1:
+                var = next(var_names)
+                lines.append(f"{var} = {expr}")
+                expr = var
+            for map_key, subpattern in pat_value:
+                visit(f"{expr}[{map_key!r}]", subpattern)
+
+        else:
+            assert False, f"{pat_kind=}"
+
+    visit("record", pattern)
+    source = "def key(record):\n    try:\n"
+    for line in lines:
+        source += f"        {line}\n"
+    source += f"        return ({''.join(leaf + ', ' for leaf in leaves)})\n"
+    source += "    except (KeyError, IndexError, TypeError, ValueError):\n"
+    source += "        raise TypeError(message)\n"
+    return _compile_function("key", source, message=f"Record does not match {sig!r}")
+
+
+def _compile_packer(patterns, sequence):
+    # For `{(a, b):first_line, {vol:loudness}:config}` generates
+    #
+    #   def pack(_0, _1, _2):
+    #       return {'first_line': [_0, _1], 'config': {'loudness': _2}}
+    #
+    #   def pack_many(rows):
+    #       return [{'first_line': [_0, _1], 'config': {'loudness': _2}} for [_0, _1, _2] in rows]
+    #
+    # A signature with a single pattern packs into that value,
+    # otherwise into a tuple of all the input args.
+    if sequence is list:
+        open_seq, close_seq = "[", "]"
+    elif sequence is tuple:
+        open_seq, close_seq = "(", ",)"
+    else:
+        raise ValueError(f"Can only pack sequences into a list or a tuple, not {sequence!r}")
+
+    var_names = (f"_{i}" for i in count())
+    params = []
+
+    def build(pattern):
+        pat_kind, pat_value = pattern
+
+        if pat_kind == "ident":
+            var = next(var_names)
+            params.append(var)
+            return var
+
+        elif pat_kind == "list":
+            if not pat_value:
+                return "[]" if sequence is list else "()"
+            return open_seq + ", ".join(build(subpattern) for subpattern in pat_value) + close_seq
+
+        elif pat_kind == "map":
+            return "{" + ", ".join(f"{key!r}: {build(subpattern)}" for key, subpattern in pat_value) + "}"
+
+        else:
+            assert False, f"{pat_kind=}"
+
+    if len(patterns) == 1:
+        expr = build(patterns[0])
+    else:
+        expr = "(" + "".join(build(pattern) + ", " for pattern in patterns) + ")"
+
+    pack = _compile_function(
+        "pack",
+        f"def pack({', '.join(params)}):\n"
+        f"    return {expr}\n",
+    )
+    pack.many = _compile_function(
+        "pack_many",
+        "def pack_many(rows):\n"
+        f"    return [{expr} for [{', '.join(params)}] in rows]\n",
+    )
+    return pack
+
+
+def _compile_function(name, source, **namespace):
+    exec(compile(source, f"<nostalgia {name}>", "exec"), namespace)
+    return namespace[name]
@@ -0,0 +1,159 @@
+import pytest
+
+from nostalgia import FanOut
+
+
+class _LookupCounter(dict):
+    fetches = 0
+
+    def __getitem__(self, key):
+        _LookupCounter.fetches += 1
+        return super().__getitem__(key)
+
+
+def _message(**meta):
+    return _LookupCounter(
+        meta=_LookupCounter({"user": "alice", "tenant": "acme", **meta}),
+        body="hello",
+        tags=["a", "b"],
+    )
+
+
+def test_fan_out_calls_every_handler():
+    hub = FanOut()
+
+    @hub.subscribe("{ {user, tenant}:meta, body }")
+    def greet(user, tenant, body):
+        return f"{body}, {user}@{tenant}"
+
+    @hub.subscribe("{ {who:user}:meta, (first, second):tags }")
+    def tags(who, first, second):
+        return who, first, second
+
+    @hub.subscribe("message")
+    def raw(message):
+        return sorted(message)
+
+    assert hub.publish(_message()) == [
+        "hello, alice@acme",
+        ("alice", "a", "b"),
+        ["body", "meta", "tags"],
+    ]
+
+    # subscribing returns the function unchanged
+    assert greet("bob", "corp", "hi") == "hi, bob@corp"
+
+
+def test_fan_out_does_shared_lookups_once():
+    hub = FanOut()
+    for _ in range(50):
+        @hub.subscribe("{ {user, tenant}:meta, body }")
+        def handler(user, tenant, body):
+            return user
+
+    _LookupCounter.fetches = 0
+    assert hub.publish(_message()) == ["alice"] * 50
+    assert _LookupCounter.fetches == 4  # meta, user, tenant, body
+
+
+def test_fan_out_isolates_errors():
+    hub = FanOut()
+
+    @hub.subscribe("{ {user}:meta }")
+    def ok(user):
+        return user
+
+    @hub.subscribe("{ {region}:meta }")
+    def missing_key(region):
+        return region
+
+    @hub.subscribe("{ (a, b, c):tags }")
+    def wrong_length(a, b, c):
+        return a
+
+    @hub.subscribe("{ {user}:meta }")
+    def broken(user):
+        raise RuntimeError(user)
+
+    @hub.subscribe("message, extra")
+    def too_many(message, extra):
+        return extra
+
+    results = hub.publish(_message())
+    assert results[0] == "alice"
+    assert isinstance(results[1], TypeError)
+    assert isinstance(results[2], TypeError)
+    assert isinstance(results[3], RuntimeError)
+    assert isinstance(results[4], TypeError)
+
+    assert hub.publish(_message(region="eu"))[1] == "eu"
+
+    results = hub.publish("not a message")
+    assert all(isinstance(result, TypeError) for result in results)
+
+
+def test_fan_out_checks_signatures():
+    hub = FanOut()
+    with pytest.raises(TypeError):
+        @hub.subscribe("{ {user, tenant}:meta }")
+        def handler(tenant, user):
+            pass
+
+
+class _BrokenLookups(dict):
+    def __getitem__(self, key):
+        if key == "broken":
+            raise LookupError("the database is on fire")
+        return super().__getitem__(key)
+
+
+class _BrokenIter:
+    def __iter__(self):
+        raise RuntimeError("can't iterate")
+
+
+def test_fan_out_isolates_lookup_errors():
+    hub = FanOut()
+
+    @hub.subscribe("message")
+    def whole(message):
+        return "whole"
+
+    @hub.subscribe("{broken}")
+    def broken(broken):
+        return broken
+
+    @hub.subscribe("{ok}")
+    def ok(ok):
+        return ok
+
+    @hub.subscribe("{ (a, b):pair }")
+    def pair(a, b):
+        return a, b
+
+    results = hub.publish(_BrokenLookups(ok="fine", pair=_BrokenIter()))
+    assert results[0] == "whole"
+    assert isinstance(results[1], LookupError)
+    assert results[2] == "fine"
+    assert isinstance(results[3], RuntimeError)
+
+
+@pytest.mark.parametrize(
+    ["sig", "args"],
+    [
+        ["{ {}:meta, body }", ({"body": 1},)],
+        ["{ ():meta, body }", ({"body": 1},)],
+        ["{ ():meta, body }", ({"body": 1, "meta": [1]},)],
+        ["{ ():meta, body }", ({"body": 1, "meta": 42},)],
+        ["(), body", ("not empty", 1)],
+    ]
+)
+def test_fan_out_checks_patterns_that_bind_nothing(sig, args):
+    hub = FanOut()
+
+    @hub.subscribe(sig)
+    def handler(body):
+        return body
+
+    [result] = hub.publish(*args)
+    assert isinstance(result, TypeError)
@@ -0,0 +1,68 @@
+import heapq
+from itertools import groupby
+
+import pytest
+
+from nostalgia import key
+
+
+SONGS = [
+    {"config": {"loudness": 11, "device": "a"}, "first_line": ["love", "regret"]},
+    {"config": {"loudness": 3, "device": "b"}, "first_line": ["distance", "loss"]},
+    {"config": {"loudness": 11, "device": "c"}, "first_line": ["bottom", "text"]},
+]
+
+
+def test_key_with_builtins():
+    song_key = key("{ {vol:loudness}:config, (t1, _):first_line }")
+    assert song_key(SONGS[0]) == (11, "love")
+
+    assert sorted(SONGS, key=song_key) == [SONGS[1], SONGS[2], SONGS[0]]
+    assert min(SONGS, key=song_key) is SONGS[1]
+    assert max(SONGS, key=song_key) is SONGS[0]
+
+    volume = key("{ {loudness}:config }")
+    by_volume = sorted(SONGS, key=volume)
+    assert [(k, len(list(group))) for k, group in groupby(by_volume, key=volume)] == [((3,), 1), ((11,), 2)]
+
+    merged = heapq.merge(SONGS[1:2], [SONGS[2], SONGS[0]], key=song_key)
+    assert list(merged) == [SONGS[1], SONGS[2], SONGS[0]]
+
+
+@pytest.mark.parametrize(
+    ["sig", "record", "expected"],
+    [
+        ["x", 42, (42,)],
+        ["()", [], ()],
+        ["(_, _, c)", "abc", ("c",)],
+        ["{a, b:c}", {"a": 1, "c": 2}, (1, 2)],
+        ["({ { {x}:y }:z }, (p, q))", [{"z": {"y": {"x": "X"}}}, ("P", "Q")], ("X", "P", "Q")],
+        ["{ {x}:'quotes\" }", {"'quotes\"": {"x": 1}}, (1,)],
+    ]
+)
+def test_key_shapes(sig, record, expected):
+    assert key(sig)(record) == expected
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        {},
+        {"config": {"loudness": 1}},
+        {"config": {"loudness": 1}, "first_line": ["a"]},
+        {"config": {"loudness": 1}, "first_line": ["a", "b", "c"]},
+        {"config": 42, "first_line": ["a", "b"]},
+        {"config": {"loudness": 1}, "first_line": None},
+        [],
+    ]
+)
+def test_key_mismatch(record):
+    with pytest.raises(TypeError):
+        key("{ {vol:loudness}:config, (t1, _):first_line }")(record)
+
+
+def test_key_needs_one_pattern():
+    with pytest.raises(ValueError):
+        key("")
+    with pytest.raises(ValueError):
+        key("a, b")
@@ -104,3 +104,27 @@ def test_mild_reminiscence_detects_disorder():
         @mild_reminiscence("first, { foo, bar: baz}, kamaz")
         def my_fn(first, foo, bar, almaz):
             pass
+
+
+def test_mild_reminiscence_lazy():
+    @mild_reminiscence("{kind, payload:body, {retries}:config}", lazy=True)
+    def handle(kind, payload, retries):
+        if kind.get() == "ping":
+            return "pong"
+        return payload.get(), retries.get()
+
+    assert handle({"kind": "ping", "body": None, "config": {"retries": 0}}) == "pong"
+    assert handle({"kind": "echo", "body": "hi", "config": {"retries": 3}}) == ("hi", 3)
+
+    with pytest.raises(TypeError):
+        handle({"kind": "ping", "config": {"retries": 0}})
+
+    @mild_reminiscence("{kind, payload:body}", lazy=True, check_keys=False)
+    def handle_unchecked(kind, payload):
+        if kind.get() == "ping":
+            return "pong"
+        return payload.get()
+
+    assert handle_unchecked({"kind": "ping"}) == "pong"
+    with pytest.raises(TypeError):
+        handle_unchecked({"kind": "echo"})
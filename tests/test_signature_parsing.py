@@ -1,7 +1,9 @@
+from collections import defaultdict
+from collections.abc import Mapping
 from types import MappingProxyType
 import pytest
 
-from nostalgia import parse_signature
+from nostalgia import NO_MATCH, filter_matching, parse_signature, partition
 
 
 def test_empty_signature():
@@ -282,3 +284,239 @@ def test_transform_reflects_transform(sig, input_args, expected_output_args):
     assert in_count == len(input_args)
     assert out_args == expected_output_args
     assert len(converter(*input_args)) == len(out_args)
+
+
+class _CountingMapping(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched = []
+
+    def __getitem__(self, key):
+        self.fetched.append(key)
+        return super().__getitem__(key)
+
+
+def test_lazy_unpacking_defers_leaves():
+    transform, converter = parse_signature("label, {x, {w, h}:size, (c1, c2):colors}", lazy=True)
+    assert transform == (2, ["label", "x", "w", "h", "c1", "c2"])
+
+    size = _CountingMapping(w=10, h=20)
+    shape = _CountingMapping(x=5, size=size, colors=("red", "blue"))
+    label, x, w, h, c1, c2 = converter("LABEL", shape)
+
+    # nested patterns need their containers, leaves are not fetched yet
+    assert shape.fetched == ["size", "colors"]
+    assert size.fetched == []
+
+    assert label.get() == "LABEL"
+    assert (c1.get(), c2.get()) == ("red", "blue")
+    assert h.get() == 20
+    assert h.get() == 20
+    assert size.fetched == ["h"]
+    assert shape.fetched == ["size", "colors"]
+
+    assert x.get() == 5
+    assert shape.fetched == ["size", "colors", "x"]
+
+
+def test_lazy_unpacking_checks_keys_up_front():
+    _, converter = parse_signature("{x, y}", lazy=True)
+    with pytest.raises(TypeError):
+        converter({"x": 10})
+
+    # not a Mapping, so there's nothing to check up front
+    x, y = converter(42)
+    with pytest.raises(TypeError):
+        x.get()
+
+    with pytest.raises(TypeError):
+        converter()
+
+
+class _PlainMapping(Mapping):
+    # keeps the default `__contains__`, which calls `__getitem__`
+    def __init__(self, **items):
+        self._items = items
+        self.fetched = []
+
+    def __getitem__(self, key):
+        self.fetched.append(key)
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def test_lazy_unpacking_never_fetches_more_than_eager():
+    _, converter = parse_signature("{a, b}", lazy=True)
+    row = _PlainMapping(a=1, b=2)
+    a, b = converter(row)
+    assert row.fetched == []
+    assert a.get() == 1
+    assert row.fetched == ["a"]
+
+    row = _PlainMapping(a=1)
+    a, b = converter(row)
+    with pytest.raises(TypeError):
+        b.get()
+
+    a, b = converter(defaultdict(int, a=1))
+    assert (a.get(), b.get()) == (1, 0)
+
+
+def test_lazy_unpacking_checks_keys_on_access():
+    _, converter = parse_signature("{x, y}", lazy=True, check_keys=False)
+    x, y = converter({"x": 10})
+    assert x.get() == 10
+    with pytest.raises(TypeError):
+        y.get()
+
+    # nested patterns are still fetched by the converter
+    _, converter = parse_signature("{{x}:point}", lazy=True, check_keys=False)
+    with pytest.raises(TypeError):
+        converter({})
+
+
+def test_lazy_unchecked_matching_checks_keys():
+    _, converter = parse_signature("{a, b}", lazy=True, check_keys=False)
+    assert converter.try_unpack({}) is NO_MATCH
+    assert not converter.matches({"a": 1})
+    assert partition(converter, [{"a": 1, "b": 2}, {"a": 1}]) == ([{"a": 1, "b": 2}], [{"a": 1}])
+
+    a, b = converter.try_unpack({"a": 1, "b": 2})
+    assert (a.get(), b.get()) == (1, 2)
+
+
+@pytest.mark.parametrize("check_keys", [False, True])
+def test_lazy_matching_agrees_with_eager(check_keys):
+    _, eager = parse_signature("{a, b}")
+    _, lazy = parse_signature("{a, b}", lazy=True, check_keys=check_keys)
+    for value in [
+        _Row(a=1, b=2),
+        _PlainMapping(a=1, b=2),
+        defaultdict(int, a=1),
+        {"a": 1, "b": 2},
+        {"a": 1},
+        "ab",
+        ["a", "b"],
+        42,
+    ]:
+        assert lazy.matches(value) is eager.matches(value)
+
+    a, b = lazy.try_unpack(_Row(a=1, b=2))
+    assert (a.get(), b.get()) == (1, 2)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize(
+    ["inputs", "expected"],
+    [
+        [("a", ("b", "c"), {"d": "D", "e": ["E", "F"]}), ["a", "b", "c", "D", "E", "F"]],
+        [("a", "bc", MappingProxyType({"d": 1, "e": "EF"})), ["a", "b", "c", 1, "E", "F"]],
+        [("a", "bc", defaultdict(lambda: "EF", d=1)), ["a", "b", "c", 1, "E", "F"]],
+        [("a", "bc", MappingProxyType(defaultdict(lambda: "EF", d=1))), ["a", "b", "c", 1, "E", "F"]],
+        [(), NO_MATCH],
+        [("a", ("b", "c")), NO_MATCH],
+        [("a", ("b", "c", "x"), {"d": "D", "e": ["E", "F"]}), NO_MATCH],
+        [("a", 42, {"d": "D", "e": ["E", "F"]}), NO_MATCH],
+        [("a", ("b", "c"), {"e": ["E", "F"]}), NO_MATCH],
+        [("a", ("b", "c"), {"d": "D", "e": ["E"]}), NO_MATCH],
+        [("a", ("b", "c"), ["D", "E", "F"]), NO_MATCH],
+        [("a", ("b", "c"), "not a map"), NO_MATCH],
+    ]
+)
+def test_try_unpack(inputs, expected, lazy):
+    _, converter = parse_signature("first, (foo, bar), {d, (e, f):e}", lazy=lazy)
+    result = converter.try_unpack(*inputs)
+    if lazy and result is not NO_MATCH:
+        result = [deferred.get() for deferred in result]
+    assert result == expected
+    assert converter.matches(*inputs) is (expected is not NO_MATCH)
+
+
+def test_filter_and_partition():
+    _, converter = parse_signature("{kind, (x, y):point}")
+    records = [
+        {"kind": "a", "point": (1, 2)},
+        {"kind": "b"},
+        {"kind": "c", "point": (1, 2, 3)},
+        {"kind": "d", "point": [3, 4]},
+        "garbage",
+    ]
+    assert list(filter_matching(converter, iter(records))) == [records[0], records[3]]
+    assert partition(converter, records) == (
+        [records[0], records[3]],
+        [records[1], records[2], records[4]],
+    )
+
+
+@pytest.mark.parametrize(
+    ["sig", "output_args", "packed"],
+    [
+        ["", [], ()],
+        ["x", [1], 1],
+        ["x, y", [1, 2], (1, 2)],
+        ["()", [], []],
+        ["{}", [], {}],
+        ["{(a, b):first_line, {vol:loudness}:config}", [1, 2, 3], {"first_line": [1, 2], "config": {"loudness": 3}}],
+        ["label, ({x, y:why}, (z))", ["L", 1, 2, 3], ("L", [{"x": 1, "why": 2}, [3]])],
+    ]
+)
+def test_packer(sig, output_args, packed):
+    _, converter = parse_signature(sig)
+    pack = converter.packer()
+    assert pack(*output_args) == packed
+    assert pack.many([output_args, output_args]) == [packed, packed]
+    assert converter.packer() is pack
+
+    if isinstance(packed, tuple):
+        assert [*converter(*packed)] == output_args
+    else:
+        assert [*converter(packed)] == output_args
+
+
+def test_packer_tuples():
+    _, converter = parse_signature("{(a, b):first_line, ((c), ()):nested}")
+    pack = converter.packer(tuple)
+    assert pack(1, 2, 3) == {"first_line": (1, 2), "nested": ((3,), ())}
+    assert pack.many(iter([(1, 2, 3)])) == [{"first_line": (1, 2), "nested": ((3,), ())}]
+
+    with pytest.raises(TypeError):
+        pack(1, 2)
+
+    with pytest.raises(ValueError):
+        converter.packer(set)
+
+
+class _Row:
+    # like a database row: has `__getitem__`, but isn't a Mapping
+    def __init__(self, **columns):
+        self._columns = columns
+
+    def __getitem__(self, key):
+        return self._columns[key]
+
+
+def test_lazy_unpacking_checks_keys_only_on_mappings():
+    _, converter = parse_signature("{a, b}", lazy=True)
+    a, b = converter(_Row(a=1, b=2))
+    assert (a.get(), b.get()) == (1, 2)
+
+    # not a Mapping, so the missing key is only noticed on access
+    a, b = converter(_Row(a=1))
+    assert a.get() == 1
+    with pytest.raises(TypeError):
+        b.get()
+
+    _, converter = parse_signature("{a}", lazy=True)
+    for invalid in ["abc", ["a"], {"a"}]:
+        [a] = converter(invalid)
+        with pytest.raises(TypeError):
+            a.get()
+        assert not converter.matches(invalid)
+
+    [a] = converter(MappingProxyType({"a": 1}))
+    assert a.get() == 1